@@ -8,6 +8,7 @@
 """
 
 import os
+import time
 import logging
 
 LOG = logging.getLogger(__name__)
@@ -15,10 +16,16 @@ LOG = logging.getLogger(__name__)
 # Global file cache
 CACHE = {}
 
+# Seconds during which a cached file is trusted without checking it again
+STAT_TTL = 1.0
+
 
 def read_file(filename: str, force_reload=False):
     """Read a file if it has been modified.
 
+    A file is checked for modification at most once every ``STAT_TTL``
+    seconds, unless reloading is forced.
+
     :param filename: File name which want to be read from.
     :param force_reload: Whether to reload the file.
     :returns: A tuple with a boolean specifying if the data is fresh or not.
@@ -27,20 +34,62 @@ def read_file(filename: str, force_reload=False):
     if force_reload:
         _delete_cached_file(filename)
 
-    reloaded = False
-    mtime = os.path.getmtime(filename)
+    now = time.monotonic()
     cache_info = CACHE.setdefault(filename, {})
+    if cache_info and now - cache_info['checked_at'] < STAT_TTL:
+        return False, cache_info['data']
+
+    reloaded = False
+    stat = os.stat(filename)
+    # Nanosecond mtime avoids reload churn caused by float truncation
+    fingerprint = (stat.st_mtime_ns, stat.st_size)
 
-    if not cache_info or mtime > cache_info.get('mtime', 0):
+    if fingerprint != cache_info.get('fingerprint'):
         LOG.debug('Reloading cached file %s', filename)
-        with open(filename) as fp:
-            cache_info['data'] = fp.read()
-        cache_info['mtime'] = mtime
+        cache_info['data'] = _read(filename, stat.st_size)
+        cache_info['fingerprint'] = fingerprint
         reloaded = True
+    cache_info['checked_at'] = now
 
     return reloaded, cache_info['data']
 
 
+def is_fresh(filename: str):
+    """Whether a cached file was checked within the last ``STAT_TTL``
+    seconds, so :func:`read_file` would return it without checking again.
+    """
+
+    cache_info = CACHE.get(filename)
+    return (bool(cache_info) and
+            time.monotonic() - cache_info['checked_at'] < STAT_TTL)
+
+
+def _read(filename: str, size: int):
+    """Read the whole content of a UTF-8 encoded file.
+
+    :param filename: File name which want to be read from.
+    :param size: Expected size of the file, so it's mostly read at once.
+    """
+
+    chunks = []
+    # Ask for one more byte than expected, so the whole file is mostly
+    # read by the first call. Only an empty read means EOF, a short read
+    # may happen anywhere on some filesystems, e.g. FUSE or NFS.
+    bufsize = size + 1
+    fd = os.open(filename, os.O_RDONLY | getattr(os, 'O_CLOEXEC', 0))
+    try:
+        while True:
+            chunk = os.read(fd, bufsize)
+            if not chunk:
+                break
+            chunks.append(chunk)
+            bufsize = 65536
+    finally:
+        os.close(fd)
+
+    return b''.join(chunks).decode('utf-8')
+
+
 def _delete_cached_file(filename: str):
     """Delete cached file if present.
 
@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+"""
+    policy._compiler
+    ~~~~~~~~~~~~~~~
+
+    Compiler for turning parsed check trees into flat functions.
+
+"""
+
+import logging
+import functools
+
+from policy import checks
+
+LOG = logging.getLogger(__name__)
+
+_ARGS = 'target, creds, enforcer, current_rule'
+
+_TEMPLATE = '''\
+def _compiled(%(args)s=None):
+    return True if %(expr)s else False
+'''
+
+
+class CompiledCheck(checks.BaseCheck):
+    """A check tree compiled into a single Python function.
+
+    Evaluating the function runs the whole tree as one expression of
+    native ``and``/``or``/``not`` operators, instead of one ``__call__``
+    per node. The tree is compiled on first use, so loading rules which
+    are never enforced costs no compiling.
+    """
+
+    def __init__(self, tree):
+        self.tree = tree
+        self.func = None
+
+    def __str__(self):
+        """Return a string representation of the compiled tree."""
+
+        return str(self.tree)
+
+    def __call__(self, target, cred, enforcer, current_rule=None):
+        """Check the policy"""
+
+        return (self.func or self.freeze())(target, cred, enforcer,
+                                            current_rule)
+
+    def freeze(self):
+        """Return the compiled function."""
+
+        if self.func is None:
+            self.func = _compile(self.tree)
+        return self.func
+
+    def __reduce__(self):
+        # The function made by exec can't be pickled, compile tree again
+        return compile_tree, (self.tree,)
+
+
+def _emit(node, leaves: dict):
+    """Emit the Python expression source for a check tree node.
+
+    Leaf checks are bound into ``leaves`` by name, so that the emitted
+    expression calls them directly.
+    """
+
+    # Exact types only, subclasses may check in their own ways
+    node_type = type(node)
+    if node_type is checks.AndCheck:
+        return '(%s)' % ' and '.join(_emit(r, leaves) for r in node.rules)
+    elif node_type is checks.OrCheck:
+        return '(%s)' % ' or '.join(_emit(r, leaves) for r in node.rules)
+    elif node_type is checks.NotCheck:
+        return '(not %s)' % _emit(node.rule, leaves)
+    elif node_type is checks.TrueCheck:
+        return 'True'
+    elif node_type is checks.FalseCheck:
+        return 'False'
+
+    # Identical leaf instances are bound only once
+    name = '_leaf%d' % id(node)
+    leaves[name] = node.freeze()
+    return '%s(%s)' % (name, _ARGS)
+
+
+def _compile(tree: checks.BaseCheck):
+    """Compile a check tree into a function.
+
+    A tree the Python compiler refuses (e.g. too deeply nested) is frozen
+    into nested closures instead, see :meth:`.BaseCheck.freeze`.
+    """
+
+    leaves = {}
+    try:
+        source = _TEMPLATE % {'args': _ARGS, 'expr': _emit(tree, leaves)}
+        code = compile(source, '<policy>', 'exec')
+    except (RuntimeError, MemoryError, SyntaxError):
+        LOG.debug('Failed to compile rule %s, freeze it instead', tree)
+        try:
+            return tree.freeze()
+        except RuntimeError:
+            return tree.__call__
+
+    exec(code, leaves)
+    return leaves['_compiled']
+
+
+@functools.lru_cache(maxsize=2048)
+def compile_tree(tree: checks.BaseCheck):
+    """Wrap a check tree into a :class:`CompiledCheck`.
+
+    Single leaf checks gain nothing from compiling and are returned as-is,
+    and so are subclasses of the 'and'/'or'/'not' checks.
+
+    Results are cached by tree, so the tree parsed for identical rules is
+    compiled just once. The tree must therefore not be modified.
+    """
+
+    if type(tree) not in (checks.AndCheck, checks.OrCheck, checks.NotCheck):
+        return tree
+
+    return CompiledCheck(tree)
@@ -9,12 +9,17 @@
 
 import re
 import logging
+import functools
 
 from policy import checks
 from policy.exceptions import InvalidRuleException
 
 LOG = logging.getLogger(__name__)
 
+# The special constant-type checks, keyed by their string representations
+_CONST_CHECKS = {str(check): check
+                 for check in (checks.FalseCheck(), checks.TrueCheck())}
+
 
 def reducer(*tokens):
     """Decorator for reduction methods.
@@ -36,6 +41,34 @@ def reducer(*tokens):
     return wrapper
 
 
+@functools.lru_cache(maxsize=4096)
+def _make_leaf_check(rule: str, raise_error: bool, handler):
+    """Make a Check object for a single base check rule.
+
+    Identical rules share one Check object, which must therefore not be
+    mutated after creation.
+    """
+
+    try:
+        kind, match = rule.split(':', 1)
+    except Exception:
+        if raise_error:
+            raise InvalidRuleException(rule)
+        else:
+            LOG.exception('Failed to understand rule %r', rule)
+            # If the rule is invalid, we'll fail closed
+            return checks.FalseCheck()
+
+    if handler is not None:
+        return handler(kind, match)
+    elif raise_error:
+        raise InvalidRuleException(rule)
+    else:
+        LOG.error('No handler for matches of kind %r', kind)
+        # If the rule is invalid, we'll fail closed
+        return checks.FalseCheck()
+
+
 class ParserMeta(type):
     """Meta class for the :class:`.Parser` class.
 
@@ -45,26 +78,33 @@ class ParserMeta(type):
     def __new__(mcs, name: str, bases: tuple, attrs: dict):
         """Create the class.
 
-        Injects the 'reducers' attribute, a list of tuple matching token
-        sequences to the name of the corresponding reduction methods.
+        Injects the '_reducers_by_len' attribute, a dict which maps length
+        of token sequences to a dict matching token sequences (as tuples)
+        to the name of the corresponding reduction methods, and the
+        '_reducer_lens' attribute, the lengths in descending order.
         """
-        reducers = []
+        reducers_by_len = {}
 
         for key, value in attrs.items():
             if not hasattr(value, 'reducers'):
                 continue
             for reduction in value.reducers:
-                reducers.append((reduction, key))
+                reducers = reducers_by_len.setdefault(len(reduction), {})
+                reducers[tuple(reduction)] = key
 
-        attrs['reducers'] = reducers
+        attrs['_reducers_by_len'] = reducers_by_len
+        attrs['_reducer_lens'] = tuple(sorted(reducers_by_len, reverse=True))
 
         return super().__new__(mcs, name, bases, attrs)
 
 
 class Parser(metaclass=ParserMeta):
 
-    # used for tokenizing the policy language
-    _TOKENIZE_RE = re.compile(r'\s+')
+    # used for tokenizing the policy language, a word may contain
+    # parentheses but neither starts with '(' nor ends with ')'
+    _TOKENIZE_RE = re.compile(r'(?P<lparen>\()|(?P<rparen>\))|'
+                              r'(?P<word>[^\s()](?:\S*[^\s)])?)')
+    _KEYWORDS = frozenset(('and', 'or', 'not'))
 
     def __init__(self, raise_error: bool):
         self.raise_error = raise_error
@@ -80,10 +120,12 @@ class Parser(metaclass=ParserMeta):
         for any more possible reductions.
         """
 
-        for reduction, methname in self.reducers:
-            token_num = len(reduction)
-            if (len(self.tokens) >= token_num and
-                    self.tokens[-token_num:] == reduction):
+        for token_num in self._reducer_lens:
+            if len(self.tokens) < token_num:
+                continue
+            methname = self._reducers_by_len[token_num].get(
+                tuple(self.tokens[-token_num:]))
+            if methname is not None:
                 # Get the reduction method
                 meth = getattr(self, methname)
 
@@ -118,72 +160,36 @@ class Parser(metaclass=ParserMeta):
         """Parse a single base check rule into an appropriate Check object."""
 
         # Handle the special constant-type checks
-        for check_cls in (checks.FalseCheck, checks.TrueCheck):
-            check = check_cls()
-            if rule == str(check):
-                return check
+        const = _CONST_CHECKS.get(rule)
+        if const is not None:
+            return const
 
-        try:
-            kind, match = rule.split(':', 1)
-        except Exception:
-            if self.raise_error:
-                raise InvalidRuleException(rule)
-            else:
-                LOG.exception('Failed to understand rule %r', rule)
-                # If the rule is invalid, we'll fail closed
-                return checks.FalseCheck()
-
-        if kind in checks.registered_checks:
-            return checks.registered_checks[kind](kind, match)
-        elif None in checks.registered_checks:
-            return checks.registered_checks[None](kind, match)
-        elif self.raise_error:
-            raise InvalidRuleException(rule)
-        else:
-            LOG.error('No handler for matches of kind %r', kind)
-            # If the rule is invalid, we'll fail closed
-            return checks.FalseCheck()
+        # The handler is a part of the cache key, so that checks registered
+        # after a rule was first parsed still take effect.
+        registered = checks.registered_checks
+        handler = registered.get(rule.partition(':')[0], registered.get(None))
+        return _make_leaf_check(rule, self.raise_error, handler)
 
     def _parse_tokenize(self, rule):
         """Tokenizer for the policy language."""
 
-        for token in self._TOKENIZE_RE.split(rule):
-            # Skip empty tokens
-            if not token or token.isspace():
+        for m in self._TOKENIZE_RE.finditer(rule):
+            token = m.group()
+            if m.lastgroup != 'word':
+                # Parentheses are tokens of their own
+                yield token, token
                 continue
 
-            # Handle leading parens on the token
-            clean = token.lstrip('(')
-            for i in range(len(token) - len(clean)):
-                yield '(', '('
-
-            # If it was only parentheses, continue
-            if not clean:
-                continue
-            else:
-                token = clean
-
-            # Handle trailing parens on the token
-            clean = token.rstrip(')')
-            trail = len(token) - len(clean)
-
-            # Yield the cleaned token
-            lowered = clean.lower()
-            if lowered in ('and', 'or', 'not'):
+            lowered = token.lower()
+            if lowered in self._KEYWORDS:
                 # Special tokens
-                yield lowered, clean
-            elif clean:
-                # Not a special token, but not composed solely of ')'
-                if len(token) >= 2 and ((token[0], token[-1]) in
-                                        [('"', '"'), ("'", "'")]):
-                    # It's a quoted string
-                    yield 'string', token[1:-1]
-                else:
-                    yield 'check', self._parse_check(clean)
-
-            # Yield the trailing parens
-            for i in range(trail):
-                yield ')', ')'
+                yield lowered, token
+            elif len(token) >= 2 and token[0] == token[-1] and (
+                    token[0] in ('"', "'")):
+                # It's a quoted string
+                yield 'string', token[1:-1]
+            else:
+                yield 'check', self._parse_check(token)
 
     def parse(self, rule: str):
         """Parses policy to tree.
@@ -266,8 +272,44 @@ class Parser(metaclass=ParserMeta):
         return [('check', checks.NotCheck(check))]
 
 
+def _flatten(check):
+    """Collapse nested 'and'/'or' checks of the same kind into one check.
+
+    e.g. ``(A and (B and C))`` becomes ``(A and B and C)``, which saves a
+    level of calls on every enforcing. The rules of 'and'/'or' checks are
+    frozen into tuples, as parsed trees are shared.
+    """
+
+    if isinstance(check, checks.NotCheck):
+        check.rule = _flatten(check.rule)
+    elif isinstance(check, (checks.AndCheck, checks.OrCheck)):
+        rules = []
+        for rule in check.rules:
+            rule = _flatten(rule)
+            if type(rule) is type(check):
+                rules.extend(rule.rules)
+            else:
+                rules.append(rule)
+        check.rules = tuple(rules)
+
+    return check
+
+
 def parse_rule(rule: str, raise_error=False):
-    """Parses policy to a tree of Check objects."""
+    """Parses policy to a tree of Check objects.
+
+    Identical rules share one tree, which must therefore not be modified,
+    so its 'and'/'or' checks raise TypeError on adding or popping checks.
+    Trees parsed before a check is registered aren't shared with later
+    parsing, so registering a check takes effect at once.
+    """
+
+    return _parse_rule(rule, raise_error, checks.registry_version)
+
+
+@functools.lru_cache(maxsize=2048)
+def _parse_rule(rule: str, raise_error: bool, registry_version: int):
+    """Cached implementation of :func:`parse_rule`."""
 
     parser = Parser(raise_error)
-    return parser.parse(rule)
+    return _flatten(parser.parse(rule))
@@ -10,13 +10,55 @@
 _sentinel = object()
 
 
+class _AttrMap(object):
+    """A read-only mapping view of object's public attributes.
+
+    Attributes are only read when looked up, so formatting a string with
+    it costs nothing for the attributes never used.
+    """
+
+    __slots__ = ('obj',)
+
+    def __init__(self, obj: object):
+        self.obj = obj
+
+    def __getitem__(self, key):
+        if key.startswith('_'):
+            raise KeyError(key)
+        val = getattr(self.obj, key, _sentinel)
+        if val is _sentinel:
+            raise KeyError(key)
+        return val
+
+
 def dict_from_object(obj: object):
-    """Convert a object into dictionary with all of its readable attributes."""
+    """Convert a object into mapping with all of its readable attributes."""
 
     # If object is a dict instance, no need to convert.
-    return (obj if isinstance(obj, dict)
-            else {attr: getattr(obj, attr)
-                  for attr in dir(obj) if not attr.startswith('_')})
+    return obj if isinstance(obj, dict) else _AttrMap(obj)
+
+
+def dict_get(d: dict, name: str, default=_sentinel):
+    """Get value of key from a dict.
+
+    In tune with `dict.get` method, or with `dict.__getitem__` method if
+    no default is given, but without the dispatching of :func:`xgetattr`.
+    """
+
+    val = d.get(name, default)
+    if val is _sentinel:
+        raise KeyError(name)
+    return val
+
+
+def attr_get(obj: object, name: str, default=_sentinel):
+    """Get attribute value from object, in tune with `getattr` method."""
+
+    val = getattr(obj, name, default)
+    if val is _sentinel:
+        msg = '%r object has no attribute %r' % (obj.__class__, name)
+        raise AttributeError(msg)
+    return val
 
 
 def xgetattr(obj: object, name: str, default=_sentinel, getitem=False):
@@ -40,9 +82,4 @@ def xgetattr(obj: object, name: str, default=_sentinel, getitem=False):
             return None if val is _sentinel else val
     else:
         # If object is not a dict, in tune with `getattr` method.
-        val = getattr(obj, name, default)
-        if val is _sentinel:
-            msg = '%r object has no attribute %r' % (obj.__class__, name)
-            raise AttributeError(msg)
-        else:
-            return val
+        return attr_get(obj, name, default)
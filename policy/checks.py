@@ -9,12 +9,14 @@
 
 import abc
 import ast
-from collections import Iterable
 
 from policy import _utils
 
 
 registered_checks = {}
+# Bumped on every registration, so caches of parsed rules can tell that
+# they may have been parsed with other checks
+registry_version = 0
 
 
 class BaseCheck(metaclass=abc.ABCMeta):
@@ -34,8 +36,27 @@ class BaseCheck(metaclass=abc.ABCMeta):
         """
         pass
 
+    def freeze(self):
+        """Return a plain function which performs the same check.
 
-class FalseCheck(BaseCheck):
+        The check must not be modified afterwards.
+        """
+
+        return self.__call__
+
+
+class _ConstantCheck(BaseCheck):
+    """Base class for checks without state, which are singletons."""
+
+    def __new__(cls):
+        # Look up the class's own dict, so that a subclass has its own one
+        instance = cls.__dict__.get('_instance')
+        if instance is None:
+            instance = cls._instance = super().__new__(cls)
+        return instance
+
+
+class FalseCheck(_ConstantCheck):
     """A policy checker that always return ``False`` (disallow) """
 
     def __str__(self):
@@ -49,7 +70,7 @@ class FalseCheck(BaseCheck):
         return False
 
 
-class TrueCheck(BaseCheck):
+class TrueCheck(_ConstantCheck):
     """A policy checker that always return ``True`` (allow) """
 
     def __str__(self):
@@ -68,12 +89,37 @@ class Check(BaseCheck):
     def __init__(self, kind, match):
         self.kind = kind
         self.match = match
+        # A match without substitutions needn't be formatted with target
+        self._static_match = '%' not in match
 
     def __str__(self):
         """Return a string representation of this checker."""
 
         return '%s:%s' % (self.kind, self.match)
 
+    def _format_match(self, target):
+        """Substitute values of target into match.
+
+        :raises KeyError: if a key required by match is not in target
+        """
+
+        if self._static_match:
+            return self.match
+        return self.match % _utils.dict_from_object(target)
+
+
+def _mutable_rules(check):
+    """Return the list of rules of an 'and'/'or' check for modifying.
+
+    :raises TypeError: if the check is a part of a tree returned by the
+        parser, which holds a tuple of rules since the tree is shared
+    """
+
+    if isinstance(check.rules, tuple):
+        raise TypeError('%s is a part of a parsed tree, which is shared and '
+                        'can not be modified' % check)
+    return check.rules
+
 
 class NotCheck(BaseCheck):
 
@@ -93,6 +139,20 @@ class NotCheck(BaseCheck):
 
         return not self.rule(target, cred, enforcer, current_rule)
 
+    def freeze(self):
+        """Return a plain function which performs the same check."""
+
+        if type(self).__call__ is not NotCheck.__call__:
+            # A subclass checks in its own way
+            return self.__call__
+
+        rule = self.rule.freeze()
+
+        def _not(target, cred, enforcer, current_rule=None):
+            return not rule(target, cred, enforcer, current_rule)
+
+        return _not
+
 
 class AndCheck(BaseCheck):
 
@@ -116,6 +176,23 @@ class AndCheck(BaseCheck):
         else:
             return True
 
+    def freeze(self):
+        """Return a plain function which performs the same check."""
+
+        if type(self).__call__ is not AndCheck.__call__:
+            # A subclass checks in its own way
+            return self.__call__
+
+        rules = tuple(rule.freeze() for rule in self.rules)
+
+        def _and(target, cred, enforcer, current_rule=None):
+            for rule in rules:
+                if not rule(target, cred, enforcer, current_rule):
+                    return False
+            return True
+
+        return _and
+
     def add_check(self, rule):
         """Adds rule to be checked.
 
@@ -124,9 +201,11 @@ class AndCheck(BaseCheck):
 
         :return: self
         :rtype: :class:`.AndChecker`
+        :raises TypeError: if the check is a part of a parsed tree
         """
 
-        self.rules.append(rule)
+        _mutable_rules(self).append(rule)
+        return self
 
 
 class OrCheck(BaseCheck):
@@ -151,6 +230,23 @@ class OrCheck(BaseCheck):
         else:
             return False
 
+    def freeze(self):
+        """Return a plain function which performs the same check."""
+
+        if type(self).__call__ is not OrCheck.__call__:
+            # A subclass checks in its own way
+            return self.__call__
+
+        rules = tuple(rule.freeze() for rule in self.rules)
+
+        def _or(target, cred, enforcer, current_rule=None):
+            for rule in rules:
+                if rule(target, cred, enforcer, current_rule):
+                    return True
+            return False
+
+        return _or
+
     def add_check(self, rule):
         """Adds rule to be checked.
 
@@ -159,18 +255,21 @@ class OrCheck(BaseCheck):
 
         :return: self
         :rtype: :class:`.AndChecker`
+        :raises TypeError: if the check is a part of a parsed tree
         """
 
-        self.rules.append(rule)
+        _mutable_rules(self).append(rule)
+        return self
 
     def pop_check(self):
         """Pops the last checker from the list and returns it.
 
         :return: self, poped checker
         :rtype: :class:`.OrChecker`, class:`.Checker`
+        :raises TypeError: if the check is a part of a parsed tree
         """
 
-        checker = self.rules.pop()
+        checker = _mutable_rules(self).pop()
         return self, checker
 
 
@@ -183,7 +282,9 @@ def register(name, _callable=None):
     :return: _callable or a decorator
     """
     def wrapper(_callable):
+        global registry_version
         registered_checks[name] = _callable
+        registry_version += 1
         return _callable
 
     # If function or class is given, do the registeration
@@ -197,9 +298,14 @@ def register(name, _callable=None):
 class RuleCheck(Check):
 
     def __call__(self, target, creds, enforcer, current_rule=None):
+        rules = enforcer.rules
         try:
-            return enforcer.rules[self.match](
-                target, creds, enforcer, current_rule)
+            try:
+                # The store's own binding of the referenced rule, if any
+                check = rules.resolved_refs[self.match]
+            except (AttributeError, KeyError):
+                check = rules[self.match]
+            return check(target, creds, enforcer, current_rule)
         except KeyError:
             # We don't have any matching rule; fail closed
             return False
@@ -212,11 +318,13 @@ class RoleCheck(Check):
 
     def __call__(self, target, creds, enforcer, current_rule=None):
         try:
-            match = self.match % _utils.dict_from_object(target)
+            match = self._format_match(target)
         except KeyError:
             # if key not present in target return False
             return False
-        roles = _utils.xgetattr(creds, self.ROLE_ATTRIBUTE, None)
+        roles = (_utils.dict_get(creds, self.ROLE_ATTRIBUTE, None)
+                 if type(creds) is dict
+                 else _utils.xgetattr(creds, self.ROLE_ATTRIBUTE, None))
         return (match.lower() in (role.lower() for role in roles)
                 if roles else False)
 
@@ -233,36 +341,70 @@ class GenericChecker(Check):
         - 'Member':%(role.name)s
     """
 
-    def _find_in_object(self, test_value, path_segments, match):
-        if len(path_segments) == 0:
-            return match == str(test_value)
+    def __init__(self, kind, match):
+        super().__init__(kind, match)
+        self._path_segments = tuple(kind.split('.'))
 
-        key, path_segments = path_segments[0], path_segments[1:]
+        # A kind which is a literal, e.g. True or 'Member', is compared with
+        # match directly, so evaluate it just once.
         try:
-            test_value = _utils.xgetattr(test_value, key, getitem=True)
-        except (KeyError, AttributeError):
-            return False
-        if (isinstance(test_value, Iterable) and
-                not isinstance(test_value, (str, bytes))):
-            for val in test_value:
-                if self._find_in_object(val, path_segments, match):
+            self._literal = str(ast.literal_eval(kind))
+            self._is_literal = True
+        except (ValueError, SyntaxError):
+            self._literal = None
+            self._is_literal = False
+
+    def _find_in_object(self, test_value, path_segments, match):
+        """Find match in the values at the path of test_value.
+
+        Iterables met on the path are searched element by element. The
+        search runs on an explicit stack, so deep values cost no extra
+        call frames and can't exceed the recursion limit.
+        """
+
+        path_len = len(path_segments)
+        stack = [(test_value, 0)]
+        while stack:
+            test_value, depth = stack.pop()
+            if depth == path_len:
+                if match == str(test_value):
                     return True
+                continue
+
+            key = path_segments[depth]
+            try:
+                # Values on the path may be of any type, so plain dicts, the
+                # usual case, are told by an identity test at each step.
+                if type(test_value) is dict:
+                    test_value = _utils.dict_get(test_value, key)
+                else:
+                    test_value = _utils.xgetattr(test_value, key,
+                                                 getitem=True)
+            except (KeyError, AttributeError):
+                continue
+
+            depth += 1
+            # Test for iterable on the type instead of the Iterable ABC,
+            # which is much slower. Strings are iterable, but are matched
+            # as a whole.
+            if (hasattr(type(test_value), '__iter__') and
+                    not isinstance(test_value, (str, bytes))):
+                # Reversed, so elements are popped in their own order
+                values = [(val, depth) for val in test_value]
+                values.reverse()
+                stack.extend(values)
             else:
-                return False
-        else:
-            return self._find_in_object(test_value, path_segments, match)
+                stack.append((test_value, depth))
+
+        return False
 
     def __call__(self, target, creds, enforcer, current_rule=None):
         try:
-            match = self.match % _utils.dict_from_object(target)
+            match = self._format_match(target)
         except KeyError:
             # if key not present in target return False
             return False
-        try:
-            test_value = ast.literal_eval(self.kind)
-            return match == str(test_value)
-        except ValueError:
-            pass
+        if self._is_literal:
+            return match == self._literal
 
-        path_segments = self.kind.split('.')
-        return self._find_in_object(creds, path_segments, match)
+        return self._find_in_object(creds, self._path_segments, match)
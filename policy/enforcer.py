@@ -7,15 +7,73 @@
 
 """
 
+import os
+import sys
 import json
+import functools
 import threading
 import logging
+from concurrent.futures import ThreadPoolExecutor
 
-from policy import checks, _parser, _cache
+from policy import checks, _parser, _cache, _compiler
 from policy.exceptions import PolicyNotAuthorized
 
+try:
+    # Use the much faster orjson to decode policy file if available
+    from orjson import loads as json_loads
+except ImportError:
+    json_loads = json.loads
+
 LOG = logging.getLogger(__name__)
 
+# Number of rules above which they are parsed in a thread pool, which is
+# only done when the interpreter runs without GIL (free-threaded build),
+# since parsing is pure Python and gains nothing from threads otherwise
+PARALLEL_THRESHOLD = 256
+_GIL_DISABLED = not getattr(sys, '_is_gil_enabled', lambda: True)()
+
+
+def _load_rule(rule: str, raise_error=False):
+    """Parse a rule, then compile the tree into a single function to cut
+    per-node call overhead on enforcing.
+    """
+
+    return _compiler.compile_tree(_parser.parse_rule(rule, raise_error))
+
+
+def _intern(name):
+    """Intern a rule name if it's a string."""
+
+    return sys.intern(name) if isinstance(name, str) else name
+
+
+def _iter_rule_refs(check):
+    """Iterate the :class:`.RuleCheck` leaves of a check tree."""
+
+    if isinstance(check, _compiler.CompiledCheck):
+        check = check.tree
+
+    if isinstance(check, checks.RuleCheck):
+        yield check
+    elif isinstance(check, checks.NotCheck):
+        yield from _iter_rule_refs(check.rule)
+    elif isinstance(check, (checks.AndCheck, checks.OrCheck)):
+        for rule in check.rules:
+            yield from _iter_rule_refs(rule)
+
+
+def _drops_refs(meth):
+    """Decorator for methods which change a :class:`Rules` store, which
+    drops the bound rule references since they may be stale then.
+    """
+
+    @functools.wraps(meth)
+    def wrapper(self, *args, **kwargs):
+        self.resolved_refs = {}
+        return meth(self, *args, **kwargs)
+
+    return wrapper
+
 
 class Rules(dict):
     """A store for rules."""
@@ -25,44 +83,109 @@ class Rules(dict):
 
         super().__init__(rules or {})
         self.default_rule = default_rule
+        self.resolve_rule_refs()
+
+    # Methods which change the store
+    __setitem__ = _drops_refs(dict.__setitem__)
+    __delitem__ = _drops_refs(dict.__delitem__)
+    if hasattr(dict, '__ior__'):
+        __ior__ = _drops_refs(dict.__ior__)
+    clear = _drops_refs(dict.clear)
+    pop = _drops_refs(dict.pop)
+    popitem = _drops_refs(dict.popitem)
+    setdefault = _drops_refs(dict.setdefault)
+    update = _drops_refs(dict.update)
+
+    @property
+    def default_rule(self):
+        """The rule used for missing rules, a rule name or a check."""
+
+        return self._default_rule
+
+    @default_rule.setter
+    def default_rule(self, default_rule):
+        self._default_rule = default_rule
+        # Work out what kind of default rule it is just once, rather than
+        # on every lookup of a missing rule.
+        self._default_check = self._default_name = None
+        if isinstance(default_rule, checks.BaseCheck):
+            self._default_check = default_rule
+        elif default_rule and isinstance(default_rule, str):
+            self._default_name = default_rule
 
     @classmethod
     def load_json(cls, data, default_rule=None, raise_error=False):
         """Allow loading of JSON rule data."""
 
-        rules = {k: _parser.parse_rule(v, raise_error)
-                 for k, v in json.loads(data).items()}
-
-        return cls(rules, default_rule)
+        return cls.from_dict(json_loads(data), default_rule, raise_error)
 
     @classmethod
     def from_dict(cls, rules_dict: dict, default_rule=None, raise_error=False):
         """Allow loading of rule data from a dictionary."""
 
-        # Parse the rules stored in the dictionary
-        rules = {k: _parser.parse_rule(v, raise_error)
-                 for k, v in rules_dict.items()}
+        # Parse the rules stored in the dictionary. Rule names are interned,
+        # so looking them up with interned strings is an identity hit.
+        names = list(rules_dict)
+        load_rule = functools.partial(_load_rule, raise_error=raise_error)
+        if _GIL_DISABLED and len(names) > PARALLEL_THRESHOLD:
+            # Rules are independent of each other, so parse them in parallel
+            with ThreadPoolExecutor(os.cpu_count() or 1) as executor:
+                loaded = list(executor.map(
+                    load_rule, (rules_dict[name] for name in names)))
+        else:
+            loaded = [load_rule(rules_dict[name]) for name in names]
+        rules = {_intern(k): v for k, v in zip(names, loaded)}
 
         return cls(rules, default_rule)
 
+    def resolve_rule_refs(self):
+        """Bind the 'rule:' references of all rules to the rules they name.
+
+        The frozen functions of referenced rules are kept in
+        ``resolved_refs`` by rule name, which :class:`.RuleCheck` calls
+        instead of looking up and calling the rule. Bindings belong to
+        this store, since checks are shared by all stores. They are
+        dropped on every change of the store, until this is called again.
+
+        Only the referenced rule itself is bound, not its references, so
+        cyclic references are harmless here.
+        """
+
+        resolved_refs = {}
+        for check in self.values():
+            for ref in _iter_rule_refs(check):
+                name = ref.match
+                if name in self and name not in resolved_refs:
+                    resolved_refs[name] = self[name].freeze()
+        self.resolved_refs = resolved_refs
+
+    def __getstate__(self):
+        # Bound rule references are functions which can't be pickled, they
+        # are bound again on unpickling
+        state = self.__dict__.copy()
+        state.pop('resolved_refs', None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.resolve_rule_refs()
+
     def __missing__(self, key):
         """Implements the default rule handling."""
 
-        # If the default rule isn't actually defined, do something
-        # reasonably intelligent
-        if not self.default_rule or isinstance(self.default_rule, dict):
-            raise KeyError(key)
+        if self._default_check is not None:
+            return self._default_check
 
-        if isinstance(self.default_rule, checks.BaseCheck):
-            return self.default_rule
+        if self._default_name is None:
+            raise KeyError(key)
 
-        # We need not check this or we will fall into infinite recursion.
-        if self.default_rule not in self:
+        # The rule named by the default rule may be added or replaced later,
+        # so it's looked up every time. `get` won't fall into `__missing__`
+        # again, so there is no infinite recursion.
+        check = self.get(self._default_name)
+        if check is None:
             raise KeyError(key)
-        elif isinstance(self.default_rule, str):
-            return self[self.default_rule]
-        else:
-            return None
+        return check
 
     def __str__(self):
         """Dumps a string representation of the rules."""
@@ -81,7 +204,7 @@ class Enforcer(object):
     """Responsible for loading and enforcing rules."""
 
     def __init__(self, policy_file, rules=None, default_rule=None,
-                 raise_error=False, load_once=True):
+                 raise_error=False, load_once=True, enabled=True):
         """
         :param policy_file: the filename of policy file
         :param rules: default rules
@@ -89,6 +212,7 @@ class Enforcer(object):
         :param raise_error: raise error on parsing rule and enforcing
                             policy or not
         :param load_once: load policy file just once
+        :param enabled: enforce policy or allow everything, e.g. in tests
         """
         self.default_rule = default_rule
         self.rules = Rules(rules, default_rule)
@@ -96,7 +220,10 @@ class Enforcer(object):
         self.raise_error = raise_error
 
         self.load_once = load_once
+        self.enabled = enabled
         self._policy_loaded = False
+        # The policy file content which rules were last loaded from
+        self._policy_data = None
         # Make rules loading thread-safe
         self._load_lock = threading.Lock()
 
@@ -111,21 +238,35 @@ class Enforcer(object):
             self.rules = Rules(rules, self.default_rule)
         else:
             self.rules.update(rules)
+            self.rules.resolve_rule_refs()
+
+    def _rules_fresh(self, force_reload=False):
+        """Whether loaded rules can be used without checking policy file."""
+
+        if not self._policy_loaded:
+            return False
+        elif self.load_once:
+            return True
+        # The file cache decides how often policy file is checked
+        return not force_reload and _cache.is_fresh(self.policy_file)
 
     def load_rules(self, force_reload=False, overwrite=True):
         """Load rules from policy file or cache."""
 
         # double-checked locking
-        if self.load_once and self._policy_loaded:
+        if self._rules_fresh(force_reload):
             return
         with self._load_lock:
-            if self.load_once and self._policy_loaded:
+            if self._rules_fresh(force_reload):
                 return
 
-            reloaded, data = _cache.read_file(
+            _, data = _cache.read_file(
                 self.policy_file, force_reload=force_reload)
             self._policy_loaded = True
-            if reloaded or not self.rules:
+            # The file cache is shared, so its reloaded flag may have gone
+            # to another enforcer. New content is new data for us, though.
+            if data is not self._policy_data or not self.rules:
+                self._policy_data = data
                 rules = Rules.load_json(data, self.default_rule, self.raise_error)
                 self._set_rules(rules, overwrite=overwrite)
                 LOG.debug('Reload policy file: %s', self.policy_file)
@@ -133,21 +274,13 @@ class Enforcer(object):
     def enforce(self, rule, target, creds, exc=None, *args, **kwargs):
         """Checks authorization of a rule against the target and credentials."""
 
+        if not self.enabled:
+            # Allow everything without loading or evaluating any rule
+            return True
+
         self.load_rules()
 
-        if isinstance(rule, checks.BaseCheck):
-            result = rule(target, creds, self, rule)
-        elif not self.rules:
-            # No rules means we're going to fail closed.
-            result = False
-        else:
-            try:
-                # Evaluate the rule
-                result = self.rules[rule](target, creds, self, rule)
-            except KeyError:
-                LOG.debug('Rule [%s] does not exist', rule)
-                # If the rule doesn't exist, fail closed
-                result = False
+        result = self._find_rule(rule)(target, creds, self, rule)
 
         if self.raise_error and not result:
             if exc:
@@ -157,6 +290,48 @@ class Enforcer(object):
 
         return result
 
+    def enforce_batch(self, requests):
+        """Checks authorization of many rules against targets and credentials.
+
+        Rules are loaded and each distinct rule is looked up only once for
+        the whole batch. Unlike :meth:`enforce`, no exception is raised
+        when a request is disallowed.
+
+        :param requests: an iterable of ``(rule, target, creds)`` tuples
+        :return: a list of results, in the order of requests
+        """
+
+        if not self.enabled:
+            return [True for _ in requests]
+
+        self.load_rules()
+
+        results = []
+        found_rules = {}
+        for rule, target, creds in requests:
+            check = found_rules.get(rule)
+            if check is None:
+                check = found_rules[rule] = self._find_rule(rule)
+            results.append(check(target, creds, self, rule))
+
+        return results
+
+    def _find_rule(self, rule):
+        """Find the check of a rule, falling back to a failing check."""
+
+        if isinstance(rule, checks.BaseCheck):
+            return rule
+        elif not self.rules:
+            # No rules means we're going to fail closed.
+            return checks.FalseCheck()
+
+        try:
+            return self.rules[rule]
+        except KeyError:
+            LOG.debug('Rule [%s] does not exist', rule)
+            # If the rule doesn't exist, fail closed
+            return checks.FalseCheck()
+
 
 if __name__ == '__main__':
     enforcer = Enforcer('policy.json')
@@ -17,6 +17,8 @@ class PolicyException(Exception):
 class InvalidRuleException(PolicyException):
     """Invalid rule exception"""
 
+    __slots__ = ('rule',)
+
     def __init__(self, rule):
         self.rule = rule
 
@@ -26,11 +28,25 @@ class InvalidRuleException(PolicyException):
     def __repr__(self):
         return '<%s: %r>' % (self.__class__.__name__, self.rule)
 
+    def __reduce__(self):
+        return type(self), (self.rule,)
+
 
 class PolicyNotAuthorized(PolicyException):
     """Default exception raised for policy enforcement failure."""
 
+    __slots__ = ('rule', 'target', 'creds')
+
     def __init__(self, rule, target, creds):
-        msg = ('%(rule)s on %(target)s by %(creds)s disallowed by policy' %
-               {'rule': rule, 'target': target, 'creds': creds})
-        super().__init__(msg)
+        self.rule = rule
+        self.target = target
+        self.creds = creds
+        # args is set by BaseException.__new__ already, don't rebuild it
+
+    def __str__(self):
+        # Formatted only when asked for, denials are often just caught
+        return ('%s on %s by %s disallowed by policy' %
+                (self.rule, self.target, self.creds))
+
+    def __reduce__(self):
+        return type(self), (self.rule, self.target, self.creds)
@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from policy import _cache
+
+
+class ReadTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.filename = os.path.join(self.tmpdir, 'policy.json')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def _write(self, content: str):
+        with open(self.filename, 'w', encoding='utf-8') as f:
+            f.write(content)
+
+    def test_read_whole_file(self):
+        content = '{"is_admin": "role:admin"}'
+        self._write(content)
+
+        self.assertEqual(content, _cache._read(self.filename, len(content)))
+
+    def test_read_empty_file(self):
+        self._write('')
+
+        self.assertEqual('', _cache._read(self.filename, 0))
+
+    def test_read_file_grown_since_stat(self):
+        content = 'x' * 100000
+        self._write(content)
+
+        self.assertEqual(content, _cache._read(self.filename, 10))
+
+    def test_read_short_reads(self):
+        content = '{"is_admin": "role:admin"}'
+        self._write(content)
+
+        real_read = os.read
+
+        def short_read(fd, n):
+            # Some filesystems return less than asked before EOF
+            return real_read(fd, min(n, 3))
+
+        with mock.patch.object(_cache.os, 'read', side_effect=short_read):
+            self.assertEqual(content,
+                             _cache._read(self.filename, len(content)))
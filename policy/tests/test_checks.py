@@ -0,0 +1,192 @@
+# -*- coding: utf-8 -*-
+import sys
+import unittest
+from unittest import mock
+
+from policy import checks
+from policy.enforcer import Rules
+
+
+class FormatMatchTestCase(unittest.TestCase):
+
+    def test_static_match(self):
+        check = checks.RoleCheck('role', 'admin')
+        self.assertEqual('admin', check._format_match({}))
+        self.assertTrue(check({}, {'roles': ['admin']}, None))
+
+    def test_substitution(self):
+        check = checks.RoleCheck('role', '%(role)s')
+        self.assertEqual('admin', check._format_match({'role': 'admin'}))
+        self.assertTrue(check({'role': 'admin'}, {'roles': ['admin']}, None))
+        self.assertFalse(check({'role': 'user'}, {'roles': ['admin']}, None))
+
+    def test_escaped_percent(self):
+        check = checks.GenericChecker('name', '100%%')
+        self.assertEqual('100%', check._format_match({}))
+
+    def test_missing_key(self):
+        check = checks.RoleCheck('role', '%(role)s')
+        with self.assertRaises(KeyError):
+            check._format_match({})
+        # Fails closed
+        self.assertFalse(check({}, {'roles': ['admin']}, None))
+
+
+class GenericCheckerTestCase(unittest.TestCase):
+
+    def test_iterables(self):
+        check = checks.GenericChecker('roles', 'admin')
+        for roles in (['user', 'admin'], ('user', 'admin'), {'admin'},
+                      iter(['admin'])):
+            self.assertTrue(check({}, {'roles': roles}, None), roles)
+        self.assertFalse(check({}, {'roles': ['user']}, None))
+
+    def test_strings_matched_whole(self):
+        self.assertTrue(checks.GenericChecker('role', 'admin')(
+            {}, {'role': 'admin'}, None))
+        self.assertFalse(checks.GenericChecker('role', 'a')(
+            {}, {'role': 'admin'}, None))
+        self.assertFalse(checks.GenericChecker('role', 'a')(
+            {}, {'role': b'a'}, None))
+
+
+    def test_path_through_lists(self):
+        check = checks.GenericChecker('groups.name', '%(g)s')
+        creds = {'groups': [{'name': 'a'}, {'id': 'x'}, {'name': 'b'}]}
+        self.assertTrue(check({'g': 'a'}, creds, None))
+        self.assertTrue(check({'g': 'b'}, creds, None))
+        self.assertFalse(check({'g': 'c'}, creds, None))
+        self.assertFalse(check({'g': 'a'}, {'groups': []}, None))
+        self.assertFalse(check({'g': 'a'}, {}, None))
+
+    def test_path_through_nested_lists(self):
+        check = checks.GenericChecker('projects.members.id', '%(id)s')
+        creds = {'projects': [
+            {'members': [{'id': '1'}, {'id': '2'}]},
+            {'members': [{'id': '3'}]},
+            {'owner': '4'},
+        ]}
+        for user_id in ('1', '2', '3'):
+            self.assertTrue(check({'id': user_id}, creds, None))
+        self.assertFalse(check({'id': '4'}, creds, None))
+
+    def test_path_through_objects(self):
+        class Node(object):
+            def __init__(self, **kwargs):
+                self.__dict__.update(kwargs)
+
+        creds = {'user': Node(project=Node(id='1'), groups=[Node(id='2')])}
+        self.assertTrue(checks.GenericChecker('user.project.id', '1')(
+            {}, creds, None))
+        self.assertTrue(checks.GenericChecker('user.groups.id', '2')(
+            {}, creds, None))
+        self.assertFalse(checks.GenericChecker('user.project.name', '1')(
+            {}, creds, None))
+
+    def test_long_path(self):
+        # Deeper than the recursion limit, searched without recursion
+        depth = sys.getrecursionlimit() + 100
+
+        class Node(object):
+            pass
+
+        creds = value = Node()
+        for _ in range(depth - 1):
+            value.a = Node()
+            value = value.a
+        value.a = 'x'
+
+        check = checks.GenericChecker('.'.join(['a'] * depth), 'x')
+        self.assertTrue(check({}, creds, None))
+
+
+    def test_literal_kinds(self):
+        check = checks.GenericChecker('True', '%(enabled)s')
+        self.assertTrue(check({'enabled': True}, {}, None))
+        self.assertFalse(check({'enabled': False}, {}, None))
+
+        check = checks.GenericChecker("'Member'", '%(role)s')
+        self.assertTrue(check({'role': 'Member'}, {}, None))
+        self.assertFalse(check({'role': 'member'}, {}, None))
+        # Compared with match, not looked up in creds
+        self.assertFalse(check({'role': 'x'}, {'Member': 'x'}, None))
+
+        check = checks.GenericChecker('42', '%(n)s')
+        self.assertTrue(check({'n': 42}, {}, None))
+
+    def test_invalid_literal_kinds(self):
+        # Kinds which aren't even Python syntax are paths
+        for kind in ('foo(', 'x[0', '1 +'):
+            check = checks.GenericChecker(kind, 'x')
+            self.assertTrue(check({}, {kind: 'x'}, None), kind)
+            self.assertFalse(check({}, {}, None), kind)
+
+
+class FreezeTestCase(unittest.TestCase):
+
+    def test_leaf(self):
+        check = checks.RoleCheck('role', 'admin')
+        frozen = check.freeze()
+
+        self.assertTrue(frozen({}, {'roles': ['Admin']}, None))
+        self.assertFalse(frozen({}, {'roles': ['user']}, None))
+
+    def test_tree(self):
+        check = checks.OrCheck(
+            checks.AndCheck(checks.RoleCheck('role', 'a'),
+                            checks.NotCheck(checks.RoleCheck('role', 'b'))),
+            checks.GenericChecker('id', '%(user_id)s'))
+        frozen = check.freeze()
+
+        for roles in ([], ['a'], ['b'], ['a', 'b']):
+            for user_id in ('1', '2'):
+                creds = {'roles': roles, 'id': '1'}
+                target = {'user_id': user_id}
+                self.assertEqual(check(target, creds, None),
+                                 frozen(target, creds, None))
+
+    def test_custom_check(self):
+        class CustomCheck(checks.Check):
+            def __call__(self, target, creds, enforcer, current_rule=None):
+                return creds.get('custom')
+
+        frozen = checks.NotCheck(CustomCheck('custom', '')).freeze()
+
+        self.assertTrue(frozen({}, {}, None))
+        self.assertFalse(frozen({}, {'custom': True}, None))
+
+    def test_overridden_call(self):
+        calls = []
+
+        class LoggedAnd(checks.AndCheck):
+            def __call__(self, target, creds, enforcer, current_rule=None):
+                calls.append(current_rule)
+                return super().__call__(target, creds, enforcer,
+                                        current_rule)
+
+        check = checks.NotCheck(LoggedAnd(checks.TrueCheck()))
+        self.assertFalse(check.freeze()({}, {}, None, 'a'))
+        self.assertEqual(['a'], calls)
+
+    def test_overridden_call_through_rule_reference(self):
+        calls = []
+
+        class LoggedAnd(checks.AndCheck):
+            def __call__(self, target, creds, enforcer, current_rule=None):
+                calls.append(current_rule)
+                return super().__call__(target, creds, enforcer,
+                                        current_rule)
+
+        rules = Rules({'a': LoggedAnd(checks.TrueCheck()),
+                       'b': checks.RuleCheck('rule', 'a')})
+        enforcer = mock.Mock(rules=rules)
+        self.assertTrue(rules['b']({}, {}, enforcer, 'b'))
+        self.assertEqual(['b'], calls)
+
+
+class ConstantCheckTestCase(unittest.TestCase):
+
+    def test_singletons(self):
+        self.assertIs(checks.TrueCheck(), checks.TrueCheck())
+        self.assertIs(checks.FalseCheck(), checks.FalseCheck())
+        self.assertIsNot(checks.TrueCheck(), checks.FalseCheck())
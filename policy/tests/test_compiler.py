@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+import itertools
+import pickle
+import unittest
+
+from policy import checks
+from policy._compiler import CompiledCheck, compile_tree
+from policy._parser import parse_rule
+
+
+class CompileTreeTestCase(unittest.TestCase):
+
+    RULES = [
+        'role:a and role:b',
+        'role:a or role:b',
+        'not role:a',
+        'role:a or role:b and role:c',
+        'role:a and role:b or role:c',
+        'not role:a and role:b or not role:c',
+        '(role:a or role:b) and not (role:b and role:c)',
+        'not (role:a or not role:b) or role:c and @',
+        'role:a and ! or role:b',
+        'role:a or id:%(user_id)s and not role:c',
+    ]
+
+    def _assert_same_as_tree(self, tree):
+        compiled = compile_tree(tree)
+        for roles in itertools.product(('a', None), ('b', None),
+                                       ('c', None)):
+            for user_id in ('1', '2'):
+                creds = {'roles': [r for r in roles if r], 'id': '1'}
+                target = {'user_id': user_id}
+                self.assertEqual(
+                    bool(tree(target, creds, None)),
+                    compiled(target, creds, None),
+                    '%s with %s on %s' % (tree, creds, target))
+
+    def test_same_as_tree(self):
+        for rule in self.RULES:
+            self._assert_same_as_tree(parse_rule(rule))
+
+    def test_too_deep_tree(self):
+        # The Python compiler refuses so deeply nested expressions
+        tree = parse_rule('not ' * 300 + 'role:a')
+        self.assertIsInstance(compile_tree(tree), CompiledCheck)
+        self._assert_same_as_tree(tree)
+
+    def test_subclass_not_compiled(self):
+        calls = []
+
+        class LoggedOr(checks.OrCheck):
+            def __call__(self, target, creds, enforcer, current_rule=None):
+                calls.append(current_rule)
+                return super().__call__(target, creds, enforcer,
+                                        current_rule)
+
+        check = LoggedOr(checks.RoleCheck('role', 'a'), checks.FalseCheck())
+        self.assertIs(check, compile_tree(check))
+
+        compiled = compile_tree(checks.AndCheck(check, checks.TrueCheck()))
+        self.assertTrue(compiled({}, {'roles': ['a']}, None, 'x'))
+        self.assertEqual(['x'], calls)
+
+    def test_pickle(self):
+        compiled = compile_tree(
+            parse_rule('role:admin or not role:user and id:%(user_id)s'))
+        self.assertIsInstance(compiled, CompiledCheck)
+
+        loaded = pickle.loads(pickle.dumps(compiled))
+        self.assertIsInstance(loaded, CompiledCheck)
+        self.assertEqual(str(compiled), str(loaded))
+        for creds in ({'roles': ['admin']}, {'roles': ['user'], 'id': '1'},
+                      {'roles': [], 'id': '1'}, {'roles': [], 'id': '2'}):
+            self.assertEqual(compiled({'user_id': '1'}, creds, None),
+                             loaded({'user_id': '1'}, creds, None))
+
+    def test_identical_rules_compiled_once(self):
+        # A rule no other test uses, so it's not compiled yet
+        rule = 'role:compiled_once or role:user'
+        compiled = compile_tree(parse_rule(rule))
+        self.assertIs(compiled, compile_tree(parse_rule(rule)))
+
+        # Compiled on first use only
+        self.assertIsNone(compiled.func)
+        self.assertTrue(compiled({}, {'roles': ['user']}, None))
+        func = compiled.func
+        self.assertIsNotNone(func)
+        self.assertIs(func, compile_tree(parse_rule(rule)).freeze())
+
+    def test_leaf_not_compiled(self):
+        leaf = parse_rule('role:admin')
+        self.assertIs(leaf, compile_tree(leaf))
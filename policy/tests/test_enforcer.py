@@ -0,0 +1,344 @@
+# -*- coding: utf-8 -*-
+import gc
+import importlib.util
+import json
+import os
+import pickle
+import shutil
+import sys
+import tempfile
+import unittest
+import weakref
+from unittest import mock
+
+from policy import _cache, checks
+from policy import enforcer as enforcer_module
+from policy.enforcer import Enforcer, Rules
+from policy.exceptions import InvalidRuleException, PolicyNotAuthorized
+
+
+class EnforcerTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.policy_file = os.path.join(self.tmpdir, 'policy.json')
+        with open(self.policy_file, 'w', encoding='utf-8') as f:
+            json.dump({
+                'is_admin': 'role:admin',
+                'user:create': 'rule:is_admin',
+                'article:delete': 'rule:is_admin or id:%(user_id)s',
+            }, f)
+        _cache.CACHE.clear()
+
+    def tearDown(self):
+        _cache.CACHE.clear()
+        shutil.rmtree(self.tmpdir)
+
+    def test_enforce(self):
+        enforcer = Enforcer(self.policy_file)
+        admin = {'id': '1', 'roles': ['admin']}
+        user = {'id': '2', 'roles': ['user']}
+        article = {'user_id': '2'}
+
+        self.assertTrue(enforcer.enforce('user:create', {}, admin))
+        self.assertFalse(enforcer.enforce('user:create', {}, user))
+        self.assertTrue(enforcer.enforce('article:delete', article, user))
+        self.assertFalse(enforcer.enforce('article:delete', {}, user))
+        self.assertFalse(enforcer.enforce('missing', {}, admin))
+
+    def test_enforce_check_object(self):
+        enforcer = Enforcer(self.policy_file)
+        admin = {'id': '1', 'roles': ['admin']}
+
+        self.assertTrue(enforcer.enforce(checks.RoleCheck('role', 'admin'),
+                                         {}, admin))
+        self.assertFalse(enforcer.enforce(checks.FalseCheck(), {}, admin))
+
+    def test_enforce_raise_error(self):
+        enforcer = Enforcer(self.policy_file, raise_error=True)
+        user = {'id': '2', 'roles': ['user']}
+
+        with self.assertRaises(PolicyNotAuthorized) as cm:
+            enforcer.enforce('user:create', {}, user)
+        self.assertEqual('user:create', cm.exception.rule)
+        self.assertIs(user, cm.exception.creds)
+
+    def test_enforce_batch(self):
+        enforcer = Enforcer(self.policy_file, raise_error=True)
+        admin = {'id': '1', 'roles': ['admin']}
+        user = {'id': '2', 'roles': ['user']}
+        article = {'user_id': '2'}
+
+        results = enforcer.enforce_batch([
+            ('user:create', {}, admin),
+            ('user:create', {}, user),
+            ('missing', {}, admin),
+            ('article:delete', article, user),
+            ('article:delete', article, {'id': '3', 'roles': []}),
+            (checks.TrueCheck(), {}, user),
+            ('missing', {}, user),
+        ])
+        self.assertEqual([True, False, False, True, False, True, False],
+                         results)
+
+    def test_disabled(self):
+        enforcer = Enforcer(os.path.join(self.tmpdir, 'missing.json'),
+                            raise_error=True, enabled=False)
+        user = {'id': '2', 'roles': ['user']}
+
+        # No policy file is loaded, everything is allowed
+        self.assertTrue(enforcer.enforce('user:create', {}, user))
+        self.assertTrue(enforcer.enforce('missing', {}, user))
+        self.assertEqual([True, True], enforcer.enforce_batch([
+            ('user:create', {}, user), ('missing', {}, user)]))
+
+        enforcer.enabled = True
+        with self.assertRaises(FileNotFoundError):
+            enforcer.enforce('user:create', {}, user)
+
+
+class EnforcerReloadTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.policy_file = os.path.join(self.tmpdir, 'policy.json')
+        _cache.CACHE.clear()
+
+    def tearDown(self):
+        _cache.CACHE.clear()
+        shutil.rmtree(self.tmpdir)
+
+    def _write_policy(self, rules: dict):
+        with open(self.policy_file, 'w', encoding='utf-8') as f:
+            json.dump(rules, f)
+
+    def test_reload_changed_file(self):
+        self._write_policy({'admin': 'role:admin'})
+        enforcer = Enforcer(self.policy_file, load_once=False)
+        creds = {'roles': ['user']}
+        self.assertFalse(enforcer.enforce('admin', {}, creds))
+
+        self._write_policy({'admin': 'role:admin or role:user'})
+        with mock.patch.object(_cache, 'STAT_TTL', 0):
+            self.assertTrue(enforcer.enforce('admin', {}, creds))
+
+    def test_no_reload_within_ttl(self):
+        self._write_policy({'admin': 'role:admin'})
+        enforcer = Enforcer(self.policy_file, load_once=False)
+        creds = {'roles': ['user']}
+        self.assertFalse(enforcer.enforce('admin', {}, creds))
+
+        self._write_policy({'admin': 'role:admin or role:user'})
+        with mock.patch.object(_cache, 'STAT_TTL', 3600):
+            self.assertFalse(enforcer.enforce('admin', {}, creds))
+            # Unless reloading is forced
+            enforcer.load_rules(force_reload=True)
+            self.assertTrue(enforcer.enforce('admin', {}, creds))
+
+    def test_reload_file_shared_by_enforcers(self):
+        self._write_policy({'admin': 'role:admin'})
+        enforcer1 = Enforcer(self.policy_file, load_once=False)
+        enforcer2 = Enforcer(self.policy_file, load_once=False)
+        creds = {'roles': ['user']}
+        self.assertFalse(enforcer1.enforce('admin', {}, creds))
+        self.assertFalse(enforcer2.enforce('admin', {}, creds))
+
+        self._write_policy({'admin': 'role:admin or role:user'})
+        with mock.patch.object(_cache, 'STAT_TTL', 0):
+            # The first enforcer finds the change in the shared file cache
+            self.assertTrue(enforcer1.enforce('admin', {}, creds))
+            self.assertTrue(enforcer2.enforce('admin', {}, creds))
+
+    def test_load_once(self):
+        self._write_policy({'admin': 'role:admin'})
+        enforcer = Enforcer(self.policy_file, load_once=True)
+        creds = {'roles': ['user']}
+        self.assertFalse(enforcer.enforce('admin', {}, creds))
+
+        self._write_policy({'admin': 'role:admin or role:user'})
+        with mock.patch.object(_cache, 'STAT_TTL', 0):
+            self.assertFalse(enforcer.enforce('admin', {}, creds))
+
+
+class RulesTestCase(unittest.TestCase):
+
+    def test_pickle(self):
+        rules = Rules({'a': checks.TrueCheck()})
+
+        loaded = pickle.loads(pickle.dumps(rules))
+        self.assertEqual(rules, loaded)
+
+    def test_pickle_parsed_rules(self):
+        rules = Rules.from_dict({
+            'admin': 'role:admin',
+            'delete': 'rule:admin or not role:guest and id:%(user_id)s',
+        }, default_rule='admin')
+
+        loaded = pickle.loads(pickle.dumps(rules))
+        self.assertIsInstance(loaded, Rules)
+        self.assertEqual(str(rules), str(loaded))
+        self.assertEqual('admin', loaded.default_rule)
+        self.assertIn('admin', loaded.resolved_refs)
+
+        enforcer = mock.Mock(rules=loaded)
+        target = {'user_id': '1'}
+        self.assertTrue(loaded['delete'](target, {'roles': ['admin']},
+                                         enforcer))
+        self.assertTrue(loaded['delete'](target, {'id': '1', 'roles': []},
+                                         enforcer))
+        self.assertFalse(loaded['delete'](target, {'id': '2', 'roles': []},
+                                          enforcer))
+        self.assertFalse(loaded['missing'](target, {'roles': []}, enforcer))
+
+
+    def test_load_json_without_orjson(self):
+        # Load a copy of the module, as if orjson weren't installed
+        spec = importlib.util.spec_from_file_location(
+            'policy._enforcer_without_orjson', enforcer_module.__file__)
+        module = importlib.util.module_from_spec(spec)
+        with mock.patch.dict(sys.modules, {'orjson': None}):
+            spec.loader.exec_module(module)
+
+        self.assertIs(json.loads, module.json_loads)
+        rules = module.Rules.load_json(
+            '{"admin": "role:admin", "delete": "rule:admin or role:\\u00e9"}')
+        self.assertEqual({'admin', 'delete'}, set(rules))
+        self.assertEqual('(rule:admin or role:\u00e9)', str(rules['delete']))
+
+
+    def test_from_dict_in_thread_pool(self):
+        rules_dict = {'rule%d' % i: 'role:r%d or (rule:rule%d and not !)'
+                      % (i, i - 1) for i in range(50)}
+        rules_dict['empty'] = ''
+        sequential = Rules.from_dict(rules_dict)
+
+        with mock.patch.object(enforcer_module, '_GIL_DISABLED', True), \
+                mock.patch.object(enforcer_module, 'PARALLEL_THRESHOLD', 1):
+            parallel = Rules.from_dict(rules_dict)
+
+        self.assertEqual(list(sequential), list(parallel))
+        self.assertEqual(str(sequential), str(parallel))
+        enforcer = mock.Mock(rules=parallel)
+        self.assertTrue(parallel['rule49']({}, {'roles': ['r3']}, enforcer))
+
+    def test_from_dict_in_thread_pool_raise_error(self):
+        rules_dict = {'rule%d' % i: 'role:r%d' % i for i in range(10)}
+        rules_dict['invalid'] = 'invalid_rule'
+
+        with mock.patch.object(enforcer_module, '_GIL_DISABLED', True), \
+                mock.patch.object(enforcer_module, 'PARALLEL_THRESHOLD', 1):
+            with self.assertRaises(InvalidRuleException):
+                Rules.from_dict(rules_dict, raise_error=True)
+
+
+class DefaultRuleTestCase(unittest.TestCase):
+
+    def test_no_default_rule(self):
+        for default_rule in (None, ''):
+            rules = Rules.from_dict({'a': 'role:a'}, default_rule)
+            with self.assertRaises(KeyError):
+                rules['missing']
+
+    def test_rule_name(self):
+        rules = Rules.from_dict({'a': 'role:a'}, default_rule='a')
+        self.assertIs(rules['a'], rules['missing'])
+        self.assertNotIn('missing', rules)
+
+    def test_rule_name_added_later(self):
+        rules = Rules.from_dict({'a': 'role:a'}, default_rule='b')
+        with self.assertRaises(KeyError):
+            rules['missing']
+
+        rules['b'] = checks.TrueCheck()
+        self.assertIs(rules['b'], rules['missing'])
+
+    def test_check(self):
+        default_rule = checks.RoleCheck('role', 'admin')
+        rules = Rules.from_dict({'a': 'role:a'}, default_rule)
+        self.assertIs(default_rule, rules['missing'])
+
+    def test_other_types(self):
+        # Neither a rule name nor a check, fail closed rather than return
+        # something which can't be called
+        for default_rule in (1, ('a',)):
+            rules = Rules({default_rule: checks.TrueCheck()}, default_rule)
+            with self.assertRaises(KeyError):
+                rules['missing']
+
+    def test_default_rule_changed(self):
+        rules = Rules.from_dict({'a': 'role:a', 'b': 'role:b'}, 'a')
+        rules.default_rule = 'b'
+        self.assertIs(rules['b'], rules['missing'])
+        rules.default_rule = None
+        with self.assertRaises(KeyError):
+            rules['missing']
+
+    def test_enforce_with_default_rule(self):
+        rules = Rules.from_dict({'a': 'role:a'}, default_rule='a')
+        enforcer = mock.Mock(rules=rules)
+        self.assertTrue(rules['missing']({}, {'roles': ['a']}, enforcer))
+        self.assertFalse(rules['missing']({}, {'roles': ['b']}, enforcer))
+
+    def test_rule_names_interned(self):
+        name = ''.join(['user', ':', 'create'])
+        rules = Rules.from_dict({name: 'role:a'})
+        self.assertIs(sys.intern(name), next(iter(rules)))
+
+
+class RuleReferenceTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        _cache.CACHE.clear()
+
+    def tearDown(self):
+        _cache.CACHE.clear()
+        shutil.rmtree(self.tmpdir)
+
+    def _make_enforcer(self, rules: dict, name='policy.json'):
+        policy_file = os.path.join(self.tmpdir, name)
+        with open(policy_file, 'w', encoding='utf-8') as f:
+            json.dump(rules, f)
+        return Enforcer(policy_file)
+
+    def test_nested_reference_after_in_place_change(self):
+        enforcer = self._make_enforcer({
+            'admin': 'role:admin',
+            'manage': 'rule:admin or role:manager',
+            'delete': 'rule:manage and not role:guest',
+        })
+        creds = {'roles': ['root']}
+        self.assertFalse(enforcer.enforce('delete', {}, creds))
+
+        enforcer.rules['admin'] = Rules.from_dict({'a': 'role:root'})['a']
+        self.assertTrue(enforcer.enforce('delete', {}, creds))
+
+        del enforcer.rules['admin']
+        self.assertFalse(enforcer.enforce('delete', {}, creds))
+
+    def test_bindings_belong_to_store(self):
+        # Both stores share the parsed 'rule:admin' check
+        enforcer1 = self._make_enforcer(
+            {'admin': 'role:admin', 'delete': 'rule:admin or role:z'},
+            name='policy1.json')
+        enforcer2 = self._make_enforcer(
+            {'admin': 'role:root', 'delete': 'rule:admin or role:z'},
+            name='policy2.json')
+        admin = {'roles': ['admin']}
+        root = {'roles': ['root']}
+
+        for _ in range(2):
+            self.assertTrue(enforcer1.enforce('delete', {}, admin))
+            self.assertFalse(enforcer1.enforce('delete', {}, root))
+            self.assertFalse(enforcer2.enforce('delete', {}, admin))
+            self.assertTrue(enforcer2.enforce('delete', {}, root))
+
+        self.assertIn('admin', enforcer1.rules.resolved_refs)
+        self.assertIn('admin', enforcer2.rules.resolved_refs)
+
+    def test_dropped_store_collected(self):
+        rules = Rules.from_dict({'a': 'role:admin', 'b': 'rule:a'})
+        ref = weakref.ref(rules)
+        del rules
+        gc.collect()
+        self.assertIsNone(ref())
@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+import pickle
+import unittest
+
+from policy.exceptions import (
+    PolicyException, InvalidRuleException, PolicyNotAuthorized)
+
+
+class InvalidRuleExceptionTestCase(unittest.TestCase):
+
+    def test_attributes(self):
+        exc = InvalidRuleException('role')
+        self.assertIsInstance(exc, PolicyException)
+        self.assertEqual('role', exc.rule)
+        self.assertEqual(('role',), exc.args)
+        self.assertEqual("Invalid rule 'role'", str(exc))
+        self.assertEqual("<InvalidRuleException: 'role'>", repr(exc))
+
+    def test_slots(self):
+        self.assertEqual(('rule',), InvalidRuleException.__slots__)
+        # Attributes are stored in the slots, not in the instance dict
+        exc = InvalidRuleException('role')
+        self.assertFalse(vars(exc))
+
+    def test_pickle(self):
+        exc = InvalidRuleException('role')
+        for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+            loaded = pickle.loads(pickle.dumps(exc, protocol))
+            self.assertIs(InvalidRuleException, type(loaded))
+            self.assertEqual('role', loaded.rule)
+            self.assertEqual(str(exc), str(loaded))
+
+
+class PolicyNotAuthorizedTestCase(unittest.TestCase):
+
+    def _make_exception(self):
+        return PolicyNotAuthorized('user:create', {'id': '1'},
+                                   {'roles': ['user']})
+
+    def test_attributes(self):
+        exc = self._make_exception()
+        self.assertIsInstance(exc, PolicyException)
+        self.assertEqual('user:create', exc.rule)
+        self.assertEqual({'id': '1'}, exc.target)
+        self.assertEqual({'roles': ['user']}, exc.creds)
+        self.assertEqual(('user:create', {'id': '1'}, {'roles': ['user']}),
+                         exc.args)
+        self.assertEqual("user:create on {'id': '1'} by "
+                         "{'roles': ['user']} disallowed by policy",
+                         str(exc))
+        self.assertEqual("PolicyNotAuthorized('user:create', {'id': '1'}, "
+                         "{'roles': ['user']})", repr(exc))
+
+    def test_slots(self):
+        self.assertEqual(('rule', 'target', 'creds'),
+                         PolicyNotAuthorized.__slots__)
+        # Attributes are stored in the slots, not in the instance dict
+        exc = self._make_exception()
+        self.assertFalse(vars(exc))
+
+    def test_pickle(self):
+        exc = self._make_exception()
+        for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+            loaded = pickle.loads(pickle.dumps(exc, protocol))
+            self.assertIs(PolicyNotAuthorized, type(loaded))
+            self.assertEqual(exc.rule, loaded.rule)
+            self.assertEqual(exc.target, loaded.target)
+            self.assertEqual(exc.creds, loaded.creds)
+            self.assertEqual(exc.args, loaded.args)
+            self.assertEqual(str(exc), str(loaded))
@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+import unittest
+
+from policy import checks
+from policy._parser import Parser, parse_rule
+
+
+class ParseRuleTestCase(unittest.TestCase):
+
+    def tearDown(self):
+        checks.registered_checks.pop('late', None)
+
+    def test_identical_rules_share_tree(self):
+        self.assertIs(parse_rule('role:admin or role:user'),
+                      parse_rule('role:admin or role:user'))
+
+    def test_check_registered_after_parsing(self):
+        self.assertIsInstance(parse_rule('late:bar'), checks.GenericChecker)
+
+        @checks.register('late')
+        class LateCheck(checks.Check):
+            def __call__(self, target, creds, enforcer, current_rule=None):
+                return True
+
+        self.assertIsInstance(parse_rule('late:bar'), LateCheck)
+        self.assertIsInstance(parse_rule('late:bar and role:admin').rules[0],
+                              LateCheck)
+
+    def test_parsed_tree_not_modifiable(self):
+        and_check = parse_rule('role:a and role:b')
+        with self.assertRaises(TypeError):
+            and_check.add_check(checks.TrueCheck())
+
+        or_check = parse_rule('role:a or role:b')
+        with self.assertRaises(TypeError):
+            or_check.add_check(checks.TrueCheck())
+        with self.assertRaises(TypeError):
+            or_check.pop_check()
+        self.assertEqual('(role:a or role:b)', str(or_check))
+
+    def test_precedence(self):
+        self.assertEqual('(role:a or (role:b and role:c))',
+                         str(parse_rule('role:a or role:b and role:c')))
+        self.assertEqual('((role:a and role:b) or role:c)',
+                         str(parse_rule('role:a and role:b or role:c')))
+        self.assertEqual('(not role:a and role:b)',
+                         str(parse_rule('not role:a and role:b')))
+        self.assertEqual('((role:a or role:b) and role:c)',
+                         str(parse_rule('(role:a or role:b) and role:c')))
+
+    def test_flatten(self):
+        check = parse_rule('role:a and (role:b and (role:c and role:d))')
+        self.assertIsInstance(check, checks.AndCheck)
+        self.assertEqual(4, len(check.rules))
+        self.assertIsInstance(check.rules, tuple)
+
+        check = parse_rule('role:a or (role:b and role:c) or role:d')
+        self.assertIsInstance(check, checks.OrCheck)
+        self.assertEqual(3, len(check.rules))
+        self.assertIsInstance(check.rules[1], checks.AndCheck)
+
+    def test_constant_checks(self):
+        self.assertIsInstance(parse_rule(''), checks.TrueCheck)
+        self.assertIsInstance(parse_rule('@'), checks.TrueCheck)
+        self.assertIsInstance(parse_rule('!'), checks.FalseCheck)
+
+    def test_invalid_rule_fails_closed(self):
+        for rule in ('role:a or', '(role:a', 'rolea'):
+            with self.assertLogs('policy._parser', 'ERROR'):
+                self.assertIsInstance(parse_rule(rule), checks.FalseCheck)
+
+
+class TokenizeTestCase(unittest.TestCase):
+
+    def _tokenize(self, rule: str):
+        return list(Parser(False)._parse_tokenize(rule))
+
+    def test_substitution_before_rparen(self):
+        tokens = self._tokenize('id:%(user_id)s)')
+        self.assertEqual(['check', ')'], [t for t, _ in tokens])
+        self.assertEqual('id:%(user_id)s', str(tokens[0][1]))
+
+        check = parse_rule('(role:admin or id:%(user_id)s)')
+        self.assertEqual('(role:admin or id:%(user_id)s)', str(check))
+
+    def test_nested_parens(self):
+        tokens = self._tokenize('((role:a))')
+        self.assertEqual(['(', '(', 'check', ')', ')'],
+                         [t for t, _ in tokens])
+        self.assertEqual('role:a', str(tokens[2][1]))
+
+        check = parse_rule('((role:a))')
+        self.assertIsInstance(check, checks.RoleCheck)
+
+    def test_keywords(self):
+        tokens = self._tokenize('not role:a AND role:b Or role:c')
+        self.assertEqual(['not', 'check', 'and', 'check', 'or', 'check'],
+                         [t for t, _ in tokens])
+
+    def test_quoted_string(self):
+        self.assertEqual([('string', 'Member')],
+                         self._tokenize("'Member'"))
+        self.assertEqual([('string', 'Member')],
+                         self._tokenize('"Member"'))
+        # A quoted kind is a part of the check
+        self.assertEqual(['check'],
+                         [t for t, _ in self._tokenize("'Member':%(role)s")])
@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+import unittest
+
+from policy import _utils, checks
+
+
+class Target(object):
+
+    def __init__(self, **kwargs):
+        self.__dict__.update(kwargs)
+
+
+class DictFromObjectTestCase(unittest.TestCase):
+
+    def test_dict(self):
+        target = {'user_id': '1'}
+        self.assertIs(target, _utils.dict_from_object(target))
+
+    def test_object(self):
+        mapping = _utils.dict_from_object(Target(user_id='1'))
+        self.assertEqual('1', mapping['user_id'])
+        self.assertEqual('user 1', 'user %(user_id)s' % mapping)
+
+    def test_missing_attribute(self):
+        mapping = _utils.dict_from_object(Target(user_id='1'))
+        with self.assertRaises(KeyError):
+            mapping['name']
+
+    def test_private_attribute(self):
+        mapping = _utils.dict_from_object(Target(_secret='1', __x='2'))
+        with self.assertRaises(KeyError):
+            mapping['_secret']
+        with self.assertRaises(KeyError):
+            mapping['__class__']
+
+    def test_attributes_read_lazily(self):
+        class LazyTarget(object):
+            user_id = '1'
+
+            @property
+            def broken(self):
+                raise RuntimeError('should not be read')
+
+        self.assertEqual('1', '%(user_id)s'
+                         % _utils.dict_from_object(LazyTarget()))
+
+    def test_object_target_in_check(self):
+        check = checks.GenericChecker('id', '%(user_id)s')
+        self.assertTrue(check(Target(user_id='1'), {'id': '1'}, None))
+        self.assertFalse(check(Target(user_id='2'), {'id': '1'}, None))
+        # Missing and private attributes fail closed
+        self.assertFalse(check(Target(), {'id': '1'}, None))
+        self.assertFalse(checks.GenericChecker('id', '%(_user_id)s')(
+            Target(_user_id='1'), {'id': '1'}, None))
+
+
+class DictGetTestCase(unittest.TestCase):
+
+    def test_dict_get(self):
+        self.assertEqual('1', _utils.dict_get({'id': '1'}, 'id'))
+        self.assertIsNone(_utils.dict_get({}, 'id', None))
+        self.assertEqual('x', _utils.dict_get({}, 'id', 'x'))
+        with self.assertRaises(KeyError):
+            _utils.dict_get({}, 'id')
+
+    def test_xgetattr(self):
+        self.assertEqual('1', _utils.xgetattr({'id': '1'}, 'id'))
+        self.assertIsNone(_utils.xgetattr({}, 'id'))
+        with self.assertRaises(KeyError):
+            _utils.xgetattr({}, 'id', getitem=True)
+        self.assertEqual('1', _utils.xgetattr(Target(id='1'), 'id'))
+        with self.assertRaises(AttributeError):
+            _utils.xgetattr(Target(), 'id')
+
+    def test_dict_subclass_in_checks(self):
+        # Dict subclasses take the generic path, so their own lookups count
+        class Creds(dict):
+            def get(self, key, default=None):
+                return ['admin'] if key == 'roles' else default
+
+            def __missing__(self, key):
+                return 'default-' + key
+
+        creds = Creds()
+        self.assertTrue(checks.RoleCheck('role', 'admin')({}, creds, None))
+        self.assertTrue(checks.GenericChecker('id', 'default-id')(
+            {}, creds, None))
+
+        # A plain dict has no such fallbacks
+        self.assertFalse(checks.RoleCheck('role', 'admin')({}, {}, None))
+        self.assertFalse(checks.GenericChecker('id', 'default-id')(
+            {}, {}, None))
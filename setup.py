@@ -1,25 +1,14 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 import os
-import sys
-import re
+import ast
 
 try:
     # Use setuptools if available
-    from setuptools import setup, find_packages
+    from setuptools import setup
 except ImportError:
     from distutils.core import setup
 
-    def find_packages():
-        return ['policy', 'policy.tests']
-
-
-# Check python version info
-if sys.version_info < (3, 0, 0):
-    raise Exception('Policy only support Python 3.0.0+')
-
-version = re.compile(r"__version__\s*=\s*'(.*?)'")
-
 
 def get_package_version():
     """return package version without importing it"""
@@ -27,11 +16,13 @@ def get_package_version():
     with open(os.path.join(base, 'policy', '__init__.py'),
               mode='rt',
               encoding='utf-8') as initf:
-        for line in initf:
-            m = version.match(line.strip())
-            if not m:
-                continue
-            return m.groups()[0]
+        tree = ast.parse(initf.read())
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and any(
+                isinstance(t, ast.Name) and t.id == '__version__'
+                for t in node.targets):
+            return ast.literal_eval(node.value)
+    return None
 
 
 def get_long_description():
@@ -65,7 +56,9 @@ def get_install_requires():
     if not os.path.exists(requirements_file):
         return []
     with open(requirements_file, mode='rt', encoding='utf-8') as f:
-        return f.read().splitlines()
+        # Skip blank lines and comments
+        return [line.strip() for line in f
+                if line.strip() and not line.lstrip().startswith('#')]
 
 
 if __name__ == '__main__':
@@ -80,6 +73,8 @@ if __name__ == '__main__':
         url='https://github.com/garenchan/policy',
         license='http://www.apache.org/licenses/LICENSE-2.0',
         classifiers=get_classifiers(),
-        packages=find_packages(),
+        packages=['policy', 'policy.tests'],
+        python_requires='>=3.3',
         install_requires=get_install_requires(),
+        extras_require={'orjson': ['orjson']},
     )